@@ -6,7 +6,6 @@
 # ====================================================================
 $ErrorActionPreference = 'Stop'
 $PSScriptRoot = (Split-Path -Parent $MyInvocation.MyCommand.Definition)
-[System.Net.ServicePointManager]::ServerCertificateValidationCallback = { $true }
 
 # --- 1. Select Profile (ต้องรู้ว่ากำลัง Build ให้ Profile ไหน) ---
 $ProfileConfigPath = (Join-Path $PSScriptRoot "config.profiles.json")
@@ -40,9 +39,9 @@ Write-Host ("Loading build data from: {0}" -f $BuildDataPath) -ForegroundColor G
 if (-not (Test-Path $SettingsConfigPath)) { throw "File not found: config.settings.json" }
 $Settings = Get-Content -Raw -Path $SettingsConfigPath | ConvertFrom-Json
 
-$CaJson = Get-Content (Join-Path $BuildDataPath "ca.json") | ConvertFrom-Json
-$StaticKeyJson = Get-Content (Join-Path $BuildDataPath "static_key.json") | ConvertFrom-Json
-$ServerCertJson = Get-Content (Join-Path $BuildDataPath "server_cert.json") | ConvertFrom-Json
+$CaJson = Get-Content -Raw -Path (Join-Path $BuildDataPath "ca.json") | ConvertFrom-Json
+$StaticKeyJson = Get-Content -Raw -Path (Join-Path $BuildDataPath "static_key.json") | ConvertFrom-Json
+$ServerCertJson = Get-Content -Raw -Path (Join-Path $BuildDataPath "server_cert.json") | ConvertFrom-Json
 
 # --- 4. Extract Shared Variables ---
 $CaPayload        = $CaJson.crt_payload.Trim()
@@ -66,20 +65,11 @@ if ($ClientJsonFiles.Count -eq 0) {
 
 Write-Host ("Found {0} client file(s). Building..." -f $ClientJsonFiles.Count) -ForegroundColor Yellow
 
-# --- 6. Core Loop: Iterate and Build ---
-foreach ($File in $ClientJsonFiles) {
-    $ClientName = $File.BaseName -replace 'client_'
-    Write-Host "  Building for '$ClientName'..."
-
-    $ClientJson = Get-Content $File.FullName | ConvertFrom-Json
-    
-    # ดึง Cert และ Key ส่วนตัวของ Client คนนี้
-    $ClientCertPayload = $ClientJson.crt_payload.Trim()
-    $ClientKeyPayload  = $ClientJson.prv_payload.Trim()
-
-    # ประกอบร่าง OVPN Template (Here-String)
-    # โครงสร้างนี้อ้างอิงจากไฟล์ตัวอย่างที่คุณส่งมา
-    $OvpnTemplate = @"
+# --- 6. Precompute OVPN Template (Here-String) ---
+# ส่วนที่ใช้ร่วมกันทุก Client (CA, Static Key, Server) ประกอบไว้ครั้งเดียว
+# เหลือแค่ Cert/Key ของแต่ละคนที่ต้องแทนค่าใน Loop
+# โครงสร้างนี้อ้างอิงจากไฟล์ตัวอย่างที่คุณส่งมา
+$OvpnTemplate = @"
 dev $VpnDevType
 persist-tun
 persist-key
@@ -96,11 +86,11 @@ $CaPayload
 </ca>
 
 <cert>
-$ClientCertPayload
+__CLIENT_CERT__
 </cert>
 
 <key>
-$ClientKeyPayload
+__CLIENT_KEY__
 </key>
 
 <tls-crypt>
@@ -108,9 +98,23 @@ $StaticKeyPayload
 </tls-crypt>
 "@
 
+# --- 7. Core Loop: Iterate and Build ---
+foreach ($File in $ClientJsonFiles) {
+    $ClientName = $File.BaseName -replace 'client_'
+    Write-Host "  Building for '$ClientName'..."
+
+    $ClientJson = Get-Content -Raw -Path $File.FullName | ConvertFrom-Json
+    
+    # ดึง Cert และ Key ส่วนตัวของ Client คนนี้
+    $ClientCertPayload = $ClientJson.crt_payload.Trim()
+    $ClientKeyPayload  = $ClientJson.prv_payload.Trim()
+
+    # แทนค่าเฉพาะส่วนของ Client ลงใน Template (String.Replace ไม่ตีความ Regex)
+    $OvpnText = $OvpnTemplate.Replace('__CLIENT_CERT__', $ClientCertPayload).Replace('__CLIENT_KEY__', $ClientKeyPayload)
+
     # บันทึกไฟล์ (ใช้ ASCII encoding มาตรฐานสำหรับ .ovpn)
     $FinalPath = Join-Path $OvpnOutputPath "$ClientName.ovpn"
-    $OvpnTemplate | Set-Content -Path $FinalPath -Encoding Ascii -Force
+    $OvpnText | Set-Content -Path $FinalPath -Encoding Ascii -Force
     Write-Host "  -> Created: $FinalPath" -ForegroundColor Green
 }
 
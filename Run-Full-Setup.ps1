@@ -45,6 +45,7 @@ $State = @{
     PSScriptRoot = $PSScriptRoot
     TempDir = (Join-Path $PSScriptRoot "temp_json")
     OutputDataPath = $OutputDataPath # <-- [NEW] ส่ง Path ไปให้ Tasks
+    ApiConnection = $null # Base URL + Auth header (สร้างครั้งเดียวใน Get-ApiConnection)
     
     # Placeholders for generated assets
     GroupId = $null
@@ -59,33 +60,29 @@ Write-Host ("Selected: {0}" -f $State.Profile.ProfileName) -ForegroundColor Gree
 Write-Host ("Using Temp Directory: {0}" -f $State.TempDir)
 
 # --- 4. Execute 9-Task Pipeline ---
-try {
-    Write-Host "`n[Task 1/9] Creating Group..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\1_Task_CreateGroup.ps1")
-
-    Write-Host "`n[Task 2/9] Creating Users..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\2_Task_CreateUsers.ps1")
-    
-    Write-Host "`n[Task 3/9] Creating CA..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\3_Task_CreateCA.ps1")
-    
-    Write-Host "`n[Task 4/9] Creating Client Certs..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\4_Task_CreateCertClient.ps1")
-    
-    Write-Host "`n[Task 5/9] Creating Server Cert..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\5_Task_CreateCertServer.ps1")
-
-    Write-Host "`n[Task 6/9] Creating Static Key..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\6_Task_CreateStaticKey.ps1")
-
-    Write-Host "`n[Task 7/9] Creating OpenVPN Instance..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\7_Task_CreateInstance.ps1")
+# รายการ Task (Label + Path) คำนวณไว้ครั้งเดียวก่อนเริ่มรัน
+$Tasks = @(
+    @{ Label = "Creating Group...";                 File = "1_Task_CreateGroup.ps1" }
+    @{ Label = "Creating Users...";                 File = "2_Task_CreateUsers.ps1" }
+    @{ Label = "Creating CA...";                    File = "3_Task_CreateCA.ps1" }
+    @{ Label = "Creating Client Certs...";          File = "4_Task_CreateCertClient.ps1" }
+    @{ Label = "Creating Server Cert...";           File = "5_Task_CreateCertServer.ps1" }
+    @{ Label = "Creating Static Key...";            File = "6_Task_CreateStaticKey.ps1" }
+    @{ Label = "Creating OpenVPN Instance...";      File = "7_Task_CreateInstance.ps1" }
+    @{ Label = "Assigning Interface (via SSH)...";  File = "8_Task_AssignInterface.ps1" }
+    @{ Label = "Setting Firewall Rules...";         File = "9_Task_SetFirewall.ps1" }
+)
+$LibPath = Join-Path $PSScriptRoot "lib"
+for ($t = 0; $t -lt $Tasks.Count; $t++) {
+    $Tasks[$t].Header = "`n[Task {0}/{1}] {2}" -f ($t+1), $Tasks.Count, $Tasks[$t].Label
+    $Tasks[$t].Path   = Join-Path $LibPath $Tasks[$t].File
+}
 
-    Write-Host "`n[Task 8/9] Assigning Interface (via SSH)..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\8_Task_AssignInterface.ps1")
-    
-    Write-Host "`n[Task 9/9] Setting Firewall Rules..." -ForegroundColor Yellow
-    . (Join-Path $PSScriptRoot "lib\9_Task_SetFirewall.ps1")
+try {
+    foreach ($task in $Tasks) {
+        Write-Host $task.Header -ForegroundColor Yellow
+        . $task.Path
+    }
 
     Write-Host "`n========================================================" -ForegroundColor Cyan
     Write-Host "✅ ALL 9 TASKS COMPLETED SUCCESSFULLY for profile: $($State.Profile.ProfileName)" -ForegroundColor Green
@@ -13,9 +13,8 @@ if ($exist) {
   Write-Host ("  Group '{0}' already exists (id={1})." -f $GroupName, $State.GroupId)
 } else {
   $payload = @{ group = @{ name = $GroupName; description = $GroupDesc } }
-  $tmp = Join-Path $State.TempDir "group_add.json"; Save-Json $tmp $payload
-  $addJson = (Call-Api "POST" "/api/auth/group/add/" $tmp).text
-  $addResult = $addJson | ConvertFrom-Json
+  $tmp = Join-Path $State.TempDir "group_add.json"; Save-Json $tmp $payload -Compress
+  $null = Call-Api "POST" "/api/auth/group/add/" $tmp
   Write-Host ("  Created new group '{0}'." -f $GroupName) -ForegroundColor Green
   
   $rows2 = Get-GroupRows
@@ -1,9 +1,12 @@
 # Task 2: Create Users
 Write-Host "  Checking/Creating Users..."
 $uRows = Get-UserRows
+# Index existing usernames once (hashtable keys are case-insensitive, same as -eq)
+$existingNames = @{}
+foreach ($row in @($uRows)) { if ($row -and $row.name) { $existingNames[[string]$row.name] = $true } }
+
 foreach ($u in $State.Users) {
-  $exist = $uRows | Where-Object { $_.name -eq $u.Name } | Select-Object -First 1
-  if ($exist) {
+  if ($existingNames.ContainsKey([string]$u.Name)) {
     Write-Host ("  User '{0}' already exists. Skipping." -f $u.Name)
     continue
   }
@@ -16,12 +19,12 @@ foreach ($u in $State.Users) {
       scrambled_password = "0"
       descr = $u.Full
       # [FIXED] Wrapped the 'if' statement in a subexpression operator $()
-      email = $(if ($u.PSObject.Properties.Name -contains 'Email') { $u.Email } else { "" })
+      email = $(if ($u.PSObject.Properties['Email']) { $u.Email } else { "" })
       comment = "VPN user (auto)"
       group_memberships = "$($State.GroupId)" # Add to group
     }
   }
-  $tmp = Join-Path $State.TempDir "user_add_$($u.Name).json"; Save-Json $tmp $payload
+  $tmp = Join-Path $State.TempDir "user_add_$($u.Name).json"; Save-Json $tmp $payload -Compress
   $res = Call-Api "POST" "/api/auth/user/add/" $tmp
   Write-Host ("  Created user '{0}'." -f $u.Name) -ForegroundColor Green
 }
@@ -27,10 +27,9 @@ if ($exist) {
       email              = ""; ocsp_uri = ""; crt_payload = ""; prv_payload = ""; serial = ""
     }
   }
-  $tmp = Join-Path $State.TempDir "ca_add.json"; Save-Json $tmp $payload
+  $tmp = Join-Path $State.TempDir "ca_add.json"; Save-Json $tmp $payload -Compress
   
-  $addJson = (Call-Api "POST" "/api/trust/ca/add" $tmp).text
-  $addResult = $addJson | ConvertFrom-Json
+  $null = Call-Api "POST" "/api/trust/ca/add" $tmp
   
   # [FIXED] Replaced unreliable Sleep with robust polling function Wait-ForCa
   $row = Wait-ForCa -Descr $CANameDesc -CN $CAName
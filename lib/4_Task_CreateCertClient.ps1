@@ -3,9 +3,17 @@ Write-Host "  Checking/Creating Client Certs..."
 $ClientCertDays = $State.Settings.Lifetimes.ClientCertLifetimeDays
 $allCerts = Get-CertRows
 
+# Index certs by CN once (first match wins) instead of scanning all certs per user
+$certsByCn = @{}
+foreach ($c in @($allCerts)) {
+  if ($c -and $c.PSObject.Properties['commonname'] -and $c.commonname -and -not $certsByCn.ContainsKey([string]$c.commonname)) {
+    $certsByCn[[string]$c.commonname] = $c
+  }
+}
+
 foreach ($name in $State.Users.Name) {
   $certObj = $null
-  $exist = $allCerts | Where-Object { ($_.PSObject.Properties['commonname'] -and $_.commonname -eq $name) } | Select-Object -First 1
+  $exist = $certsByCn[[string]$name]
   
   if ($exist) {
     $refExist = if ($exist.PSObject.Properties['refid']) { [string]$exist.refid } else { "" }
@@ -15,26 +23,12 @@ foreach ($name in $State.Users.Name) {
   } else {
     $now = Get-Date; $exp = $now.AddDays($ClientCertDays)
     $descr = ('Client_{0}_{1:yyyyMMdd-HHmmss}_exp{2:yyyyMMdd}' -f $name, $now, $exp)
-    $payload = @{
-      cert = @{
-        action               = "internal"; cert_type = "usr_cert"; type = "client"
-        caref                = $State.CaRefId
-        descr                = $descr
-        key_type             = "2048"; digest = "sha256"
-        lifetime             = "$ClientCertDays"
-        country              = "TH"; state="TH"; city="TH"
-        organization         = "AutoOrg"; organizationalunit="AutoOU"
-        commonname           = $name
-        private_key_location = "firewall" # <-- สำคัญ: บอกให้ API ส่ง Key กลับมา
-        crt_payload          = ""; prv_payload = ""; csr_payload = ""
-      }
-    }
+    $payload = @{ cert = (New-InternalCertFields "usr_cert" "client" $descr $name $ClientCertDays) }
 
-    $tmp = Join-Path $State.TempDir "clientcert_add_$($name).json"; Save-Json $tmp $payload
+    $tmp = Join-Path $State.TempDir "clientcert_add_$($name).json"; Save-Json $tmp $payload -Compress
     
     # [FIXED] API 'add' ส่ง JSON ที่มี crt และ prv กลับมา (เพราะ private_key_location = "firewall")
-    $addJson = (Call-Api "POST" "/api/trust/cert/add" $tmp).text
-    $addResult = $addJson | ConvertFrom-Json
+    $null = Call-Api "POST" "/api/trust/cert/add" $tmp
     
     $row = Wait-ForCert -Descr $descr -CN $name
     if (-not $row) { Write-Warning "  Could not find cert for '$name' after creation. It may fail to export." ; continue }
@@ -16,26 +16,14 @@ if ($existing.Count -gt 0) {
 } else {
   $now = Get-Date; $exp = $now.AddDays($Days)
   $descr = ('{0}_{1:yyyyMMdd-HHmmss}_exp{2:yyyyMMdd}' -f $ServerCN, $now, $exp)
-  $fields = @{
-    action               = "internal"; cert_type = "server_cert"; type = "server"
-    caref                = $State.CaRefId
-    descr                = $descr
-    key_type             = "2048"; digest = "sha256"
-    lifetime             = "$Days"
-    country              = "TH"; state = "TH"; city = "TH"
-    organization         = "AutoOrg"; organizationalunit = "AutoOU"
-    commonname           = $ServerCN
-    private_key_location = "firewall"
-    crt_payload          = ""; prv_payload = ""; csr_payload = ""
-  }
+  $fields = New-InternalCertFields "server_cert" "server" $descr $ServerCN $Days
   if ($ServerIPs -and $ServerIPs.Count -gt 0) { $fields['altnames_ip'] = ($ServerIPs -join ",") }
   
   $payload = @{ cert = $fields }
-  $tmp = Join-Path $State.TempDir "servercert_add.json"; Save-Json $tmp $payload
+  $tmp = Join-Path $State.TempDir "servercert_add.json"; Save-Json $tmp $payload -Compress
   
   # [FIXED] API 'add' ส่ง JSON กลับมา
-  $addJson = (Call-Api "POST" "/api/trust/cert/add" $tmp).text
-  $addResult = $addJson | ConvertFrom-Json
+  $null = Call-Api "POST" "/api/trust/cert/add" $tmp
   
   $row = Wait-ForCert -Descr $descr -CN $ServerCN
   if (-not $row) { throw "Failed to find server cert '$ServerCN' after creation." }
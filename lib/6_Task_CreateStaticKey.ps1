@@ -1,6 +1,6 @@
 # Task 6: Create Static Key
 $emptyJsonPath = Join-Path $State.TempDir "empty.json"
-Save-Json $emptyJsonPath @{}
+Save-Json $emptyJsonPath @{} -Compress
 
 $ModeShort = if ($State.Settings.StaticKeyMode -match '^tls-?auth$') { "auth" } else { "crypt" }
 $Desc      = "{0}-{1}-{2}" -f $State.Settings.NamePatterns.StaticKeyPrefix, $ModeShort, (Get-Date -Format "yyyyMMdd-HHmmss")
@@ -18,7 +18,8 @@ if ($exist) {
     Save-Json (Join-Path $State.OutputDataPath "static_key.json") ($sk_content | ConvertFrom-Json)
 } else {
     $genJson = (Call-Api "GET" "/api/openvpn/instances/gen_key/secret").text
-    $keyText = ($genJson | ConvertFrom-Json).key
+    $genObj  = $genJson | ConvertFrom-Json
+    $keyText = $genObj.key
     
     # [FIXED] เปลี่ยนข้อความ Error เป็นภาษาอังกฤษ
     if ($keyText -notmatch 'BEGIN OpenVPN Static key V1') {
@@ -26,17 +27,23 @@ if ($exist) {
     }
     
     # [NEW] Save generated key data
-    Save-Json (Join-Path $State.OutputDataPath "static_key.json") ($genJson | ConvertFrom-Json)
+    Save-Json (Join-Path $State.OutputDataPath "static_key.json") $genObj
 
     $payload = @{ statickey = @{ description=$Desc; mode=$ModeShort; key=$keyText } }
-    $tmp = Join-Path $State.TempDir "static_key_add.json"; Save-Json $tmp $payload
+    $tmp = Join-Path $State.TempDir "static_key_add.json"; Save-Json $tmp $payload -Compress
     $add = Call-Api "POST" "/api/openvpn/instances/add_static_key" $tmp
+    $addResult = TryJson $add.text
     
-    $r_search2 = Call-Api "POST" "/api/openvpn/instances/search_static_key" $emptyJsonPath
-    $row = @( (TryJson $r_search2.text).rows ) | Where-Object { $_.description -eq $Desc } | Select-Object -First 1
+    # 'add' ส่ง uuid กลับมาแล้ว ไม่ต้อง search ซ้ำ (search เฉพาะกรณีที่ไม่มี uuid)
+    $newUuid = if ($addResult -and $addResult.PSObject.Properties['uuid']) { [string]$addResult.uuid } else { "" }
+    if (-not $newUuid) {
+      $r_search2 = Call-Api "POST" "/api/openvpn/instances/search_static_key" $emptyJsonPath
+      $row = @( (TryJson $r_search2.text).rows ) | Where-Object { $_.description -eq $Desc } | Select-Object -First 1
+      if ($row) { $newUuid = [string]$row.uuid }
+    }
     
-    if (-not $row -or -not $row.uuid) { throw "Failed to find static key '$Desc' after creation."}
-    $State.StaticKeyUuid = $row.uuid
+    if (-not $newUuid) { throw "Failed to find static key '$Desc' after creation."}
+    $State.StaticKeyUuid = $newUuid
     Write-Host ("  Created static key '{0}' (uuid={1})." -f $Desc, $State.StaticKeyUuid) -ForegroundColor Green
 }
 
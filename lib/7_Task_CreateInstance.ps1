@@ -47,7 +47,7 @@ $addBody = @{
     tls_key             = $TLSUUID
   }
 }
-$AddJson = Join-Path $State.TempDir "ovpn_add.json"; Save-Json $AddJson $addBody
+$AddJson = Join-Path $State.TempDir "ovpn_add.json"; Save-Json $AddJson $addBody -Compress
 $r_add = Call-Api "POST" "/api/openvpn/instances/add" $AddJson
 $uuid = $null; try{ $uuid = (TryJson $r_add.text).uuid }catch{$uuid=$null}
 if(-not $uuid){ throw "No uuid returned from add instance: $($r_add.text)" }
@@ -61,12 +61,12 @@ $setBody = @{ instance = @{
   various_flags = "float"
   cert_depth    = "1"
 } }
-$SetJson = Join-Path $State.TempDir "ovpn_set_flat.json"; Save-Json $SetJson $setBody
+$SetJson = Join-Path $State.TempDir "ovpn_set_flat.json"; Save-Json $SetJson $setBody -Compress
 $r_set = Call-Api "POST" "/api/openvpn/instances/set/$uuid" $SetJson
 Write-Host ("  Set local_network, push_route, and float flag.")
 
 # --- 4) Apply ---
-$tmpEmpty = Join-Path $State.TempDir "empty.json"; Save-Json $tmpEmpty @{}
+$tmpEmpty = Join-Path $State.TempDir "empty.json"; Save-Json $tmpEmpty @{} -Compress
 $apply = Call-Api "POST" "/api/openvpn/service/reconfigure" $tmpEmpty
 Write-Host ("  Reconfigure command sent (status: {0})" -f (TryJson $apply.text).status)
 
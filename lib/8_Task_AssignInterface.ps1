@@ -146,10 +146,10 @@ try {
     Write-Host "  No new or existing interfaces found to apply."
   } else {
     Write-Host "  Applying configuration for interfaces: $($allOpts -join ', ')"
-    foreach ($optId in $allOpts) {
-      $apply = Invoke-SSHCommand -SessionId $sess.SessionId -Command "/usr/local/sbin/configctl interface reconfigure $optId"
-      Write-Host ("  Apply {0}: {1}" -f $optId, ($apply.Output -join ' ')) -ForegroundColor Yellow
-    }
+    # Send all reconfigure calls in one SSH round-trip instead of one per interface
+    $applyCmds = $allOpts | ForEach-Object { "/usr/local/sbin/configctl interface reconfigure $_" }
+    $apply = Invoke-SSHCommand -SessionId $sess.SessionId -Command ($applyCmds -join '; ')
+    Write-Host ("  Apply {0}: {1}" -f ($allOpts -join ', '), ($apply.Output -join ' ')) -ForegroundColor Yellow
   }
   Write-Host ("  Interface assignment finished. New: {0} | Existing: {1}" -f (($newOpts -join ', ')), (($existOpts -join ', ')))
 }
@@ -2,14 +2,24 @@
 $VpnPort = $State.Settings.Firewall.VpnListenPort
 $VpnProto = $State.Settings.Firewall.VpnProto.ToUpper() -replace '4|6','' # udp4 -> UDP
 
+# --- Fetch existing auto-vpn rules once (shared by Rule 1 and Rule 2) ---
+$autoRules = @()
+$ruleSearchError = $null
+try {
+    $search = Call-Api-Firewall -Path "/api/firewall/filter/search_rule" -Method POST -Body @{ searchPhrase = "auto-vpn" }
+    if ($search -and $search.rows) { $autoRules = @($search.rows) }
+} catch {
+    $ruleSearchError = $_.Exception.Message
+}
+
 # --- Rule 1: WAN Allow UDP Port ---
 $Desc1 = "WAN allow $VpnProto $VpnPort to this firewall (auto-vpn)"
 Write-Host ("  Ensuring firewall rule '{0}' exists..." -f $Desc1)
 
 try {
-    $search = Call-Api-Firewall -Path "/api/firewall/filter/search_rule" -Method POST -Body @{ searchPhrase = $Desc1 }
-    $existing = $search.rows | Where-Object { $_.description -eq $Desc1 }
-    if ($existing) {
+    if ($ruleSearchError) { throw $ruleSearchError }
+    $existing = @($autoRules | Where-Object { $_.description -eq $Desc1 })
+    if ($existing.Count -gt 0) {
         Write-Host "  WAN rule already exists (UUID: $($existing[0].uuid))."
     } else {
         $payload = @{
@@ -36,9 +46,9 @@ $Desc2 = "Default allow OpenVPN group to any (auto-vpn)"
 Write-Host ("  Ensuring firewall rule '{0}' exists..." -f $Desc2)
 
 try {
-    $search2 = Call-Api-Firewall -Path "/api/firewall/filter/search_rule" -Method POST -Body @{ searchPhrase = $Desc2 }
-    $existing2 = $search2.rows | Where-Object { $_.description -eq $Desc2 }
-    if ($existing2) {
+    if ($ruleSearchError) { throw $ruleSearchError }
+    $existing2 = @($autoRules | Where-Object { $_.description -eq $Desc2 })
+    if ($existing2.Count -gt 0) {
         Write-Host "  OpenVPN rule already exists (UUID: $($existing2[0].uuid))."
     } else {
         $payload = @{
@@ -10,9 +10,15 @@ $ErrorActionPreference = 'Stop'
 $Global:Utf8NoBom = New-Object System.Text.UTF8Encoding($false)
 
 # --- JSON Helpers ---
-function Save-Json($Path, $Obj){
-  $jsonText = ConvertTo-Json -InputObject $Obj -Depth 80
-  [IO.File]::WriteAllText($Path, $jsonText, $Global:Utf8NoBom)
+# -Compress: request bodies in TempDir are machine-read only, so skip pretty-printing
+function Save-Json($Path, $Obj, [switch]$Compress){
+  $jsonText = ConvertTo-Json -InputObject $Obj -Depth 80 -Compress:$Compress
+  # Skip the write when the file already holds the same content (re-runs, shared empty.json)
+  if ([IO.File]::Exists($Path) -and [IO.File]::ReadAllText($Path, $Global:Utf8NoBom) -ceq $jsonText) { return }
+  # Write to a sibling temp file then swap it in, so a failed run never leaves a half-written JSON
+  $tmpPath = "$Path.tmp"
+  [IO.File]::WriteAllText($tmpPath, $jsonText, $Global:Utf8NoBom)
+  if ([IO.File]::Exists($Path)) { [IO.File]::Replace($tmpPath, $Path, $null) } else { [IO.File]::Move($tmpPath, $Path) }
 }
 
 function TryJson($text){
@@ -40,15 +46,27 @@ function Handle-WebException($ErrorRecord, $Method, $Path, $Component="API") {
     throw "API Error ($Component) ($Method $Path): HTTP $code. Response: $text"
 }
 
+# --- API Connection (Internal) ---
+# Base URL and Basic auth header depend only on the profile; build them once per run
+function Get-ApiConnection {
+  if (-not $State.ApiConnection) {
+    $pair = "$($State.Profile.ApiKey):$($State.Profile.ApiSecret)"
+    $State.ApiConnection = [pscustomobject]@{
+      BaseUrl   = $State.Profile.ApiBaseUrl.TrimEnd('/')
+      BasicAuth = "Basic " + [Convert]::ToBase64String([Text.Encoding]::ASCII.GetBytes($pair))
+    }
+  }
+  return $State.ApiConnection
+}
+
 # --- API Call Helper (Main) ---
 # [FIXED] Replaced Invoke-WebRequest (PS 3.0+) with System.Net.WebClient (PS 2.0+)
 function Call-Api($Method, $Path, $BodyPath="", $Accept="application/json"){
-  $url  = ($State.Profile.ApiBaseUrl.TrimEnd('/')) + $Path
-  $pair = "$($State.Profile.ApiKey):$($State.Profile.ApiSecret)"
-  $basicAuth = "Basic " + [Convert]::ToBase64String([Text.Encoding]::ASCII.GetBytes($pair))
+  $conn = Get-ApiConnection
+  $url  = $conn.BaseUrl + $Path
 
   $wc = New-Object System.Net.WebClient
-  $wc.Headers.Add("Authorization", $basicAuth)
+  $wc.Headers.Add("Authorization", $conn.BasicAuth)
   $wc.Headers.Add("Accept", $Accept)
   
   $text = ""
@@ -78,12 +96,11 @@ function Call-Api($Method, $Path, $BodyPath="", $Accept="application/json"){
 # --- API Call Helper (Firewall) ---
 # [FIXED] Replaced Invoke-RestMethod (PS 3.0+) with System.Net.WebClient (PS 2.0+)
 function Call-Api-Firewall($Method, $Path, $BodyObj=$null){
-  $uri = ($State.Profile.ApiBaseUrl.TrimEnd('/')) + $Path
-  $pair = "$($State.Profile.ApiKey):$($State.Profile.ApiSecret)"
-  $basicAuth = "Basic " + [Convert]::ToBase64String([Text.Encoding]::ASCII.GetBytes($pair))
+  $conn = Get-ApiConnection
+  $uri = $conn.BaseUrl + $Path
 
   $wc = New-Object System.Net.WebClient
-  $wc.Headers.Add("Authorization", $basicAuth)
+  $wc.Headers.Add("Authorization", $conn.BasicAuth)
   $wc.Headers.Add("Accept", "application/json")
   
   $responseText = ""
@@ -92,7 +109,7 @@ function Call-Api-Firewall($Method, $Path, $BodyObj=$null){
     if ($Method -eq "POST") {
         $json = ""
         if ($BodyObj -ne $null) { 
-            $json = ($BodyObj | ConvertTo-Json -Depth 10)
+            $json = ($BodyObj | ConvertTo-Json -Depth 10 -Compress)
         }
         $wc.Headers.Add("Content-Type", "application/json")
         $responseText = $wc.UploadString($uri, $Method, $json)
@@ -151,6 +168,22 @@ function Get-Label($row){
   return ""
 }
 
+# --- Cert Payload Helper (Task 4, Task 5) ---
+function New-InternalCertFields([string]$CertType,[string]$Type,[string]$Descr,[string]$CN,$Days){
+  return @{
+    action               = "internal"; cert_type = $CertType; type = $Type
+    caref                = $State.CaRefId
+    descr                = $Descr
+    key_type             = "2048"; digest = "sha256"
+    lifetime             = "$Days"
+    country              = "TH"; state = "TH"; city = "TH"
+    organization         = "AutoOrg"; organizationalunit = "AutoOU"
+    commonname           = $CN
+    private_key_location = "firewall" # <-- สำคัญ: บอกให้ API ส่ง Key กลับมา
+    crt_payload          = ""; prv_payload = ""; csr_payload = ""
+  }
+}
+
 # [NEW] Added Wait-ForCa (for Task 3)
 function Wait-ForCa([string]$Descr,[string]$CN,[int]$Tries=10,[int]$DelayMs=500){
   for ($i=0; $i -lt $Tries; $i++){
@@ -167,13 +200,16 @@ function Wait-ForCa([string]$Descr,[string]$CN,[int]$Tries=10,[int]$DelayMs=500)
 }
 
 function Wait-ForCert([string]$Descr,[string]$CN,[int]$Tries=10,[int]$DelayMs=500){
+  # Build the subject pattern and filter once, not per try / per row
+  $namePattern = "*CN=$CN*"
+  $match = {
+    ($_.PSObject.Properties['descr'] -and $_.descr -eq $Descr) -or
+    ($_.PSObject.Properties['commonname'] -and $_.commonname -eq $CN) -or
+    ($_.PSObject.Properties['name'] -and ($_.name -like $namePattern))
+  }
   for ($i=0; $i -lt $Tries; $i++){
     $rows = Get-CertRows
-    $row  = $rows | Where-Object {
-      ($_.PSObject.Properties['descr'] -and $_.descr -eq $Descr) -or
-      ($_.PSObject.Properties['commonname'] -and $_.commonname -eq $CN) -or
-      ($_.PSObject.Properties['name'] -and ($_.name -like "*CN=$CN*"))
-    } | Select-Object -First 1
+    $row  = $rows | Where-Object $match | Select-Object -First 1
     if ($row) { return $row }
     Write-Host "  ...waiting for Cert '$CN' (try $($i+1)/$Tries)..." -ForegroundColor DarkGray
     Start-Sleep -Milliseconds $DelayMs
@@ -182,11 +218,13 @@ function Wait-ForCert([string]$Descr,[string]$CN,[int]$Tries=10,[int]$DelayMs=50
 }
 
 function Find-CertsByCN([string]$CN){
+  $namePattern  = "*CN=$CN*"
+  $descrPattern = "$CN*"
   $rows = Get-CertRows
   $rows | Where-Object {
     ($_.PSObject.Properties['commonname'] -and $_.commonname -eq $CN) -or
-    ($_.PSObject.Properties['name']       -and ($_.name -like "*CN=$CN*")) -or
-    ($_.PSObject.Properties['descr']      -and $_.descr -like "$CN*")
+    ($_.PSObject.Properties['name']       -and ($_.name -like $namePattern)) -or
+    ($_.PSObject.Properties['descr']      -and $_.descr -like $descrPattern)
   }
 }
 
@@ -198,7 +236,7 @@ function Try-DelCert([string]$RefId){
   Write-Host ("  ...del cert {0} (method 1) failed, trying next..." -f $RefId) -ForegroundColor DarkGray
   
   try {
-    $tmp = Join-Path $State.TempDir "tmp_del_cert.json"; Save-Json $tmp @{ refid = $RefId }
+    $tmp = Join-Path $State.TempDir "tmp_del_cert.json"; Save-Json $tmp @{ refid = $RefId } -Compress
     $res2 = Call-Api "POST" "/api/trust/cert/del" $tmp
     if ($res2.code -match '^2' -and $res2.text -notmatch '"failed"') { return $true }
   } catch {}
@@ -210,6 +248,8 @@ function Try-DelCert([string]$RefId){
 # --- SSH Helpers ---
 # [FIXED] Changed from auto-install to check-and-throw
 function Ensure-PoshSSH {
+  # Already imported in this session: skip the slow -ListAvailable module path scan
+  if (Get-Module -Name Posh-SSH) { return }
   if (-not (Get-Module -ListAvailable -Name Posh-SSH)) {
     throw "Module 'Posh-SSH' is not installed. Please run: `Install-Module -Name Posh-SSH -Scope CurrentUser` and try again."
   }